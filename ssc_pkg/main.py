@@ -3,12 +3,16 @@
 
 import argparse
 import logging
+import os
 import re
 import shutil
 from collections import deque
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path, PurePath
 from time import perf_counter_ns
-from typing import Any, Callable, Iterable, Optional
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import attr
 
 from yaml import load
 
@@ -65,9 +69,10 @@ def get_file_list(
 	ignore_handler(curr, filter_function(path))
 	"""
 
-	explore = deque([input_dir])
+	# directory entries already know whether they are directories, which saves a stat per object
+	explore: deque[tuple[Path, bool]] = deque([(input_dir, input_dir.is_dir())])
 	while len(explore) > 0:
-		curr = explore.popleft()
+		curr, curr_is_dir = explore.popleft()
 
 		if filter_function:
 			filter_result = filter_function(curr)
@@ -76,8 +81,9 @@ def get_file_list(
 					ignore_handler(curr, filter_result)
 				continue
 
-		if curr.is_dir():
-			explore.extend(list(curr.iterdir()))
+		if curr_is_dir:
+			with os.scandir(curr) as entries:
+				explore.extend([(curr / e.name, e.is_dir()) for e in entries])
 		if handler:
 			handler(curr)
 		yield curr
@@ -193,16 +199,45 @@ def _run_transform_obj(
 	raise TypeError(f'transform {type(transform_obj).__name__} not recognized')
 
 
-def _run_transform_action(transform_obj, target: Path, original: Path):
-	'''Run the provided transform with the paths provided'''
+def _load_simfile(target: Path, cache: dict[tuple[int, int], simfile.Simfile]) -> simfile.Simfile:
+	'''Parse the simfile at the target path, reusing the cached parse if the file is unchanged on disk
+
+	The cache is keyed by modification time and size.
+	Rewrites by the runner itself clear the cache, so the next transform always sees the new simfile.
+	Edits made on disk by a :class:`~.abc.FileTransform` returning None are NOT guaranteed to be seen:
+	on coarse-timestamp filesystems (e.g. FAT), a same-size edit may not change the key.
+	Such transforms must return the changed :class:`Simfile` instead.
+	'''
+	stat = target.stat()
+	key = (stat.st_mtime_ns, stat.st_size)
+	try:
+		return cache[key]
+	except KeyError:
+		pass
+
+	with open(target, encoding='utf-8') as f:
+		sf = simfile.text_to_simfile(f)
+	cache.clear()
+	cache[key] = sf
+	return sf
+
+
+def _run_transform_action(
+	transform_obj, target: Path, original: Path,
+	cache: Optional[dict[tuple[int, int], simfile.Simfile]] = None
+):
+	'''Run the provided transform with the paths provided
+
+	Passing the same cache for consecutive transforms of a target
+	saves reparsing the simfile when the previous transform didn't change it.
+	'''
 
 	time_start = perf_counter_ns()
 
 	# load
 	# NOTE it might be faster not to load very large simfiles
 	# with FileTransform impls that ignore the object anyways...
-	with open(target, encoding='utf-8') as f:
-		sf_orig = simfile.text_to_simfile(f)
+	sf_orig = _load_simfile(target, {} if cache is None else cache)
 
 	# modify
 	transform_obj.logger.debug(
@@ -217,6 +252,8 @@ def _run_transform_action(transform_obj, target: Path, original: Path):
 		with open(target_new, 'x', encoding='utf-8') as f:
 			f.write(simfile.simfile_to_ssc(sf_new))
 		target_new.replace(target)
+		if cache is not None:
+			cache.clear()
 
 	if isinstance(transform_obj, abc.Cleanable):
 		transform_obj.clean()
@@ -225,6 +262,76 @@ def _run_transform_action(transform_obj, target: Path, original: Path):
 	transform_obj.logger.debug(f"transformed '{target}' ({time_elapsed / 1000000 :.0f} ms)")
 
 
+def _run_transform_group(
+	transform_objs, simfiles_generated: Iterable[tuple[Path, Path]],
+	caches: Optional[Mapping[Path, dict[tuple[int, int], simfile.Simfile]]] = None
+):
+	'''Run the transforms over each (target, original) simfile pair in turn
+
+	``caches`` can provide already filled parse caches (see :func:`_load_simfile`) by target.
+	'''
+	for target, original in simfiles_generated:
+		time_original_curr = perf_counter_ns()
+
+		# transforms MUST NOT modify the simfile when returning None,
+		# so one parse can be shared until a transform changes the file
+		cache: dict[tuple[int, int], simfile.Simfile] = {} if caches is None else caches.get(target, {})
+		for tobj in transform_objs:
+			try:
+				_run_transform_action(tobj, target, original, cache)
+			except Exception:
+				logging.error(f"transform '{type(tobj).__name__}' failed on simfile '{target}'")
+				raise
+
+		time_elapsed = perf_counter_ns() - time_original_curr
+		logging.debug(f"transformed {target} ({time_elapsed / 1000000 :.0f} ms)")
+
+
+def _shared_file_groups(
+	simfiles_generated: Iterable[tuple[Path, Path]],
+	caches: dict[Path, dict[tuple[int, int], simfile.Simfile]],
+) -> list[list[tuple[Path, Path]]]:
+	'''Group (target, original) simfile pairs that may touch the same files
+
+	Two simfiles land in the same group when the folder of either target, or the folder of any file
+	either one references (music, banner, ...), is shared, e.g. via ``#MUSIC:../shared.wav``.
+	References are read before any transform runs; the parses are left in ``caches``, by target.
+	'''
+	# union-find over resolved folders
+	parents: dict[Path, Path] = {}
+
+	def find(folder: Path) -> Path:
+		root = parents.setdefault(folder, folder)
+		while root != parents[root]:
+			root = parents[root]
+		parents[folder] = root
+		return root
+
+	owners: list[tuple[Path, tuple[Path, Path]]] = []
+	for target, original in simfiles_generated:
+		try:
+			sf = _load_simfile(target, caches.setdefault(target, {}))
+		except Exception:
+			logging.error(f"failed to load simfile '{target}'")
+			raise
+		folder = target.parent.resolve()
+		folders = {folder}
+		folders.update(
+			(target.parent / value).resolve().parent
+			for value in (getattr(sf, f.name) for f in attr.fields(simfile.Simfile))
+			if isinstance(value, PurePath)
+		)
+		root = find(folder)
+		for other in folders:
+			parents[find(other)] = root
+		owners.append((folder, (target, original)))
+
+	groups: dict[Path, list[tuple[Path, Path]]] = {}
+	for folder, pair in owners:
+		groups.setdefault(find(folder), []).append(pair)
+	return list(groups.values())
+
+
 def _run_transform(args, simfiles):
 	'''Run some transforms over all simfiles'''
 
@@ -241,19 +348,32 @@ def _run_transform(args, simfiles):
 		except KeyError:
 			logging.error(f"unknown transform '{t}' at index {i}")
 
-	for target, original in simfiles_generated:
-		time_original_curr = perf_counter_ns()
+	if args.jobs <= 1:
+		_run_transform_group(transform_objs, simfiles_generated)
+	else:
+		# simfiles that share a folder, either their own or that of a file they reference (e.g. audio),
+		# are handled in order by one worker, so no two workers touch files in the same folder.
+		# this holds for the references present before transforming; transforms must not point them elsewhere.
+		# threads suffice, since the slow transforms wait on subprocesses (e.g. oggenc)
+		caches: dict[Path, dict[tuple[int, int], simfile.Simfile]] = {}
+		groups = _shared_file_groups(simfiles_generated, caches)
 
-		for tobj in transform_objs:
+		# transform objects can hold per-simfile state between transform and clean, so they aren't shared
+		transform_types = [type(tobj) for tobj in transform_objs]
+
+		def run_group(group: list[tuple[Path, Path]]) -> None:
+			_run_transform_group([t() for t in transform_types], group, caches)
+
+		with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+			futures = [executor.submit(run_group, group) for group in groups]
 			try:
-				_run_transform_action(tobj, target, original)
-			except Exception:
-				logging.error(f"transform '{type(tobj).__name__}' failed on simfile '{target}'")
+				for future in as_completed(futures):
+					future.result() # re-raises the first failure
+			except BaseException:
+				# like the serial run, stop at the first failure: drop the queued folders, and only let running ones finish
+				executor.shutdown(cancel_futures=True)
 				raise
 
-		time_elapsed = perf_counter_ns() - time_original_curr
-		logging.debug(f"transformed {target} ({time_elapsed / 1000000 :.0f} ms)")
-
 	time_elapsed = perf_counter_ns() - time_original
 	logging.info(f"transformed {len(simfiles)} simfiles ({time_elapsed / 1000000 :.0f} ms)")
 
@@ -300,6 +420,8 @@ def main():
 		help="object names that match a regex will not be considered (default: '%(default)s')")
 	parser.add_argument('-t', '--transforms', nargs='*', type=str, default=[],
 		help='transform(s) to run on the simfiles')
+	parser.add_argument('-j', '--jobs', type=int, default=1,
+		help='number of simfile folders to transform concurrently (default: %(default)s)')
 	args = parser.parse_args()
 
 	# set up logging
@@ -1,6 +1,6 @@
 '''reference parsing code for make'''
 
-from typing import Any, Callable, Iterable, Mapping, Sequence
+from typing import Any, Callable, ClassVar, Iterable, Mapping
 
 from ssc_pkg import notedata
 
@@ -68,7 +68,7 @@ class Parser:
 		value: VarValue
 		# only supports scalars and lists right now
 		try:
-			if not isinstance(try_value, str) and isinstance(try_value, Sequence):
+			if isinstance(try_value, (list, tuple)):
 				value = p.get_sequence(try_value, (), p.parse_scalar)
 			else:
 				value = p.get(try_value, (), p.parse_scalar)
@@ -85,27 +85,29 @@ class Parser:
 
 	# type helpers
 
-	def _parse_mapping(self, raw_command: Mapping) -> Command:
-		keys = raw_command.keys()
+	# built once instead of on every _parse_mapping call
+	# NOTE the order of keys is the order in which commands are recognized
+	_MAPPING_KEY_TO_FUNC: ClassVar[Mapping[str, Callable[[Any, Any], Command]]] = {
+		'copy': _parse_Copy,
 
-		key_to_func: Mapping[str, Callable[[Any], Command]] = {
-			'copy': self._parse_Copy,
+		'pragma': _parse_Pragma,
+		'def': _parse_Def,
+		'call': _parse_Call,
+		'let': _parse_Let,
+		'for': _parse_For,
+	}
+	_MAPPING_NO_RECURSE_OBJ: ClassVar[frozenset[str]] = frozenset({'pragma', 'def', 'let', 'for'})
 
-			'pragma': self._parse_Pragma,
-			'def': self._parse_Def,
-			'call': self._parse_Call,
-			'let': self._parse_Let,
-			'for': self._parse_For,
-		}
-		no_recurse_obj = {'pragma', 'def', 'let', 'for'}
+	def _parse_mapping(self, raw_command: Mapping) -> Command:
+		no_recurse_obj = self._MAPPING_NO_RECURSE_OBJ
 
-		for k in key_to_func:
-			if k in keys:
+		for k, func in self._MAPPING_KEY_TO_FUNC.items():
+			if k in raw_command:
 				command = raw_command
 				if k not in no_recurse_obj:
 					command = command[k]
 				try:
-					return key_to_func[k](command)
+					return func(self, command)
 				except Exception as e:
 					if k in no_recurse_obj:
 						raise ParseError((), f'failed to parse {k} command') from e
@@ -140,13 +142,17 @@ class Parser:
 	# top level functions
 
 	def parse_command(self, raw_command) -> Command:
-		'''Parse a single command'''
+		'''Parse a single command
+
+		Only the concrete container types produced by the YAML loader are recognized,
+		which are much cheaper to check for than the ``collections.abc`` ABCs.
+		'''
 
-		if isinstance(raw_command, Mapping):
+		if isinstance(raw_command, dict):
 			return self._parse_mapping(raw_command)
 		if isinstance(raw_command, str):
 			return self._parse_str(raw_command)
-		if isinstance(raw_command, Sequence):
+		if isinstance(raw_command, (list, tuple)):
 			return self._parse_Group(raw_command)
 
 		raise TypeError(f'unknown type of command: {raw_command}')
@@ -1,6 +1,7 @@
+import io
 import logging
-from collections import OrderedDict as ordered_dict
-from enum import Enum, auto
+import re
+from functools import lru_cache
 from typing import Any, Callable, ClassVar, Iterable, Optional, Sequence, Type, TypeVar, Union
 from warnings import warn
 
@@ -36,22 +37,83 @@ class MSDItem:
 	value: str = attr.ib(validator=_get_validate_part(END_VALUE))
 
 	def __str__(self):
-		return f'{self.BEGIN}{self.tag}{self.END_TAG}{self.value}{self.END_VALUE}'
+		return _format_item(self.tag, self.value)
 
+	@classmethod
+	def _unchecked(cls, tag: str, value: str) -> 'MSDItem':
+		'''Construct an item without running validators
 
-class _ParsingState(Enum):
-	NOTHING = auto()
-	TAG_DATA = auto()
+		Callers MUST already guarantee that the tag and value are valid, e.g. because they were just parsed.
+		'''
+		obj = object.__new__(cls)
+		object.__setattr__(obj, 'tag', tag)
+		object.__setattr__(obj, 'value', value)
+		return obj
 
 
-def text_to_msd(text: Union[str, Iterable[str]]) -> Iterable[MSDItem]: # noqa: C901
+# module-level copies of the syntactical elements, since global loads are cached but ClassVar lookups aren't
+_BEGIN, _END_TAG, _END_VALUE = MSDItem.BEGIN, MSDItem.END_TAG, MSDItem.END_VALUE
+
+
+def _format_item(tag: str, value: str, end: str = '') -> str:
+	'''The one place the item syntax is spelled out for output'''
+	return f'{_BEGIN}{tag}{_END_TAG}{value}{_END_VALUE}{end}'
+
+
+_COMMENT_REGEX = re.compile(r'//[^\n]*')
+'''regex object to match comments, which continue until the end of the line'''
+
+_ITEM_REGEX = re.compile(
+	r'(?:[^\S\n]*\n)*' # skip blank lines
+	r'#(?P<tag>[^:\n]*):' # the tag must end on the same line it starts
+	r'(?P<value>[^;]*)'
+)
+'''regex object to match the start of an item, up to (but not including) the end of its value'''
+
+_ITEM_END_REGEX = re.compile(r';[^\S\n]*(?:\n|\Z)')
+'''regex object to match the end of an item value, and the rest of its line'''
+
+_BLANK_LINES_REGEX = re.compile(r'(?:[^\S\n]*\n)*')
+_BLANK_END_REGEX = re.compile(r'\s*\Z')
+
+
+def _line_number(text: str, pos: int) -> int:
+	return text.count('\n', 0, pos) + 1 # standard text editor convention for error messages
+
+
+def _line_at(text: str, pos: int) -> str:
+	line_end = text.find('\n', pos)
+	return text[pos:] if line_end == -1 else text[pos:line_end + 1]
+
+
+def _item_start_error(text: str, pos: int) -> MSDSyntaxError:
+	'''Diagnose why :const:`_ITEM_REGEX` did not match at ``pos``'''
+	m = _BLANK_LINES_REGEX.match(text, pos)
+	if m:
+		pos = m.end()
+	il, line = _line_number(text, pos), _line_at(text, pos)
+	if not line.startswith(MSDItem.BEGIN):
+		return MSDSyntaxError(
+			f"Line {il}: expected '{MSDItem.BEGIN}' to start a new item, "
+			f"but got '{line[:len(MSDItem.BEGIN)]}' instead"
+		)
+	return MSDSyntaxError(
+		f"Line {il}: expected a '{MSDItem.END_TAG}' to end item tag, "
+		f"but got '{line[len(MSDItem.BEGIN):]}' instead"
+	)
+
+
+def text_to_msd(text: Union[str, Iterable[str]]) -> Iterable[MSDItem]:
 	'''Generate structured Python MSD objects from string MSD
 
-	NOTE Iterable[str] is provided for convenience with file objects.
+	NOTE Iterable[str] is provided for convenience with file objects,
+	which are read whole rather than line by line.
 
 	NOTE This parser is stricter than SM ``/src/MsdFile.cpp``:
 
 	-	All items must start at the beginning of lines.
+	-	Lines end with ``\\n`` (or ``\\r\\n``); lone ``\\r`` is not a line break.
+		File objects opened in text mode already translate line endings.
 	-	Unclosed items will cause undefined behavior.
 		(SM rstrips the text and soldiers on; this is too complex to replicate.)
 	-	Backslash escapes are not supported.
@@ -61,70 +123,58 @@ def text_to_msd(text: Union[str, Iterable[str]]) -> Iterable[MSDItem]: # noqa: C
 		- SM3.9 doesn't support it at all
 		- SM5 interprets them in standard fashion, so ``\\t`` becomes an actual tab character
 
-	Maybe a regex-based solution would be easier to maintain than this behemoth
+	The text is scanned item by item with regexes instead of line by line,
+	so the line numbers in error messages are only computed when needed.
 	'''
-	if isinstance(text, str):
-		text = text.splitlines(keepends = True)
-
-	state: _ParsingState = _ParsingState.NOTHING
-	tag_name: str
-	current_content: str = ''
-
-	for il, line in enumerate(text):
-		il += 1 # standard text editor convention for error messages
-
-		# trim comments first, just as in SM.
-		comment_trim = line.find('//')
-		if comment_trim != -1:
-			line = line[:-comment_trim]
-
-		if state is _ParsingState.NOTHING:
-			if not line.strip():
-				continue
-			if not line.startswith(MSDItem.BEGIN):
-				raise MSDSyntaxError(
-					f"Line {il}: expected '{MSDItem.BEGIN}' to start a new item, "
-					f"but got '{line[:len(MSDItem.BEGIN)]}' instead"
-				)
-			line = line[len(MSDItem.BEGIN):]
-			if MSDItem.END_TAG not in line:
-				raise MSDSyntaxError(
-					f"Line {il}: expected a '{MSDItem.END_TAG}' to end item tag, "
-					f"but got '{line}' instead"
-				)
-			tag_name, line = line.split(MSDItem.END_TAG, 1)
-			state = _ParsingState.TAG_DATA
-
-		# if state is _ParsingState.TAG_DATA:
-		line_end = line.split(MSDItem.END_VALUE, 1)
-		if len(line_end) > 1:
-			if line_end[1].strip():
-				raise MSDSyntaxError(
-					f"Line {il}: after ending item value there should be no content'"
-					f"but got '{line_end[1]}' instead"
-				)
-			current_content += line_end[0]
-			yield MSDItem(tag_name, current_content)
-			state = _ParsingState.NOTHING
-			current_content = ''
-			tag_name = ''
-		else:
-			current_content += line
-
-	if state is not _ParsingState.NOTHING:
-		logging.warning('parse warning: unexpected EOF while reading item')
-		yield MSDItem(tag_name, current_content)
+	for m in _scan_items(_prepare_text(text)):
+		yield MSDItem._unchecked(m['tag'], m['value'])
+
+
+def _prepare_text(text: Union[str, Iterable[str]]) -> str:
+	if isinstance(text, io.TextIOBase):
+		text = text.read() # one call instead of a str object per line
+	elif not isinstance(text, str):
+		text = ''.join(text)
+
+	# trim comments first, just as in SM.
+	return _COMMENT_REGEX.sub('', text)
+
+
+def _scan_items(text: str) -> Iterable[re.Match[str]]:
+	'''Generate the :const:`_ITEM_REGEX` match of each item in comment-free text'''
+	pos = 0
+	while not _BLANK_END_REGEX.match(text, pos):
+		m = _ITEM_REGEX.match(text, pos)
+		if not m:
+			raise _item_start_error(text, pos)
+		pos = m.end()
+
+		if pos == len(text):
+			logging.warning('parse warning: unexpected EOF while reading item')
+			yield m
+			return
+
+		m_end = _ITEM_END_REGEX.match(text, pos)
+		if not m_end:
+			raise MSDSyntaxError(
+				f"Line {_line_number(text, pos)}: after ending item value there should be no content'"
+				f"but got '{_line_at(text, pos + len(MSDItem.END_VALUE))}' instead"
+			)
+		yield m
+		pos = m_end.end()
 
 
 def msd_to_lines(items: Iterable[MSDItem]) -> Iterable[str]:
 	'''lazy converter of MSD items to string representation'''
+	# formatted in one step, rather than copying each (possibly large) item string again to append the newline
 	for item in items:
-		yield str(item) + '\n'
+		yield _format_item(item.tag, item.value, '\n')
 
 
 def msd_to_text(items: Iterable[MSDItem]) -> str:
-	'''convenience wrapper around :meth:`~.msd_to_lines`'''
-	return ''.join(msd_to_lines(items))
+	'''eager equivalent of ``''.join(msd_to_lines(items))``'''
+	# MSDItem.__str__ is skipped, since the per-item method dispatch dominates when serializing whole files
+	return ''.join([_format_item(item.tag, item.value, '\n') for item in items])
 
 
 # type variable helpers
@@ -132,6 +182,10 @@ _T_obj = TypeVar('_T_obj', bound=attr.AttrsInstance)
 _T_val = TypeVar('_T_val')
 
 
+# attrs classes can't change their fields after creation, so the name lookup only needs building once per class
+_fields_dict = lru_cache(maxsize=None)(attr.fields_dict)
+
+
 # generic conversion functions
 
 def attrs_obj_to_msd(
@@ -148,13 +202,8 @@ def attrs_obj_to_msd(
 
 	MSD is inherently a flat structure, so callers should only use this function on flat/POD objects.
 	'''
-	attr_field_data = attr.fields(type(attrs_obj))
-	obj_data = attr.asdict(attrs_obj, dict_factory=ordered_dict, recurse=False)
-	assert [a.name for a in attr_field_data] == list(obj_data.keys())
-
-	data = list(zip(obj_data.keys(), (a.type for a in attr_field_data), obj_data.values()))
-
-	for name, val_type, value in data:
+	for field in attr.fields(type(attrs_obj)):
+		name, val_type, value = field.name, field.type, getattr(attrs_obj, field.name)
 		if val_type is None:
 			warn(
 				f'class {type(attrs_obj)} variable {name} has no type information,'
@@ -179,7 +228,7 @@ def msd_to_attrs_obj(
 	the value used will be from the last MSD item,
 	but the duplicate items will not be returned.
 	'''
-	attr_field_data = attr.fields_dict(attrs_class)
+	attr_field_data = _fields_dict(attrs_class)
 
 	unused_items = []
 	creation_dict = {}
@@ -187,11 +236,12 @@ def msd_to_attrs_obj(
 		tag, value = item.tag, item.value
 
 		name = tag_converter(tag)
-		if name not in attr_field_data:
+		field = attr_field_data.get(name)
+		if field is None:
 			unused_items.append(item)
 			continue
 
-		val_type = attr_field_data[name].type
+		val_type = field.type
 		if val_type is None:
 			warn(f'class {attrs_class} variable {name} has no type information')
 			val_type = Any # type: ignore # ??
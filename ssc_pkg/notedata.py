@@ -3,12 +3,16 @@
 :const:`Position` is the canonical type for representing the time position of notes.
 '''
 
+from bisect import bisect_left, bisect_right
 from enum import Enum, auto
 from fractions import Fraction
-from itertools import chain, groupby
-from math import gcd
+from functools import cached_property, lru_cache
+from itertools import chain, groupby, islice
+from math import lcm
 from numbers import Rational
-from typing import Generic, Iterable, Sequence, Union, TypeVar, overload
+from operator import attrgetter, eq, itemgetter, sub
+from sys import intern
+from typing import Generic, Iterable, Optional, Sequence, Union, TypeVar, overload
 
 import attr
 
@@ -30,6 +34,7 @@ The latter precludes ``float``.
 
 _SM_TEXT_BEATS_PER_MEASURE = 4 # regardless of time signature data elsewhere
 _SM_TEXT_MEASURE_SEP = ','
+_SM_TEXT_EMPTY_MEASURE_CHARS = '0 \t\r\n'
 
 
 @attr.s(auto_attribs=True, frozen=True, slots=True)
@@ -62,21 +67,79 @@ class NoteData(Generic[NoteType]):
 	semantic data about what notes actually mean.
 	'''
 
-	def __validate_notes(self, _, notes_list: list[_NoteRow]):
-		if len(note_row_lengths := set(len(r.notes) for r in notes_list)) > 1:
+	# all the notes stored by this object, in [beat: notes] form
+	_notes: list[_NoteRow[NoteType]] = attr.ib(
+		factory=list, converter=_normalize_notes
+	)
+
+	# memoized result of density(), since the data can't change
+	_density: Optional[tuple[DensityInfo, ...]] = attr.ib(init=False, default=None, repr=False, eq=False)
+
+	def __attrs_post_init__(self):
+		# validation happens here rather than in an attrs validator, so it can run over the ticks;
+		# it still honors attr.validators.set_disabled
+		if not attr.validators.get_disabled():
+			self.__validate_notes()
+
+	# the arrays below are built on first use, so construction and iteration alone don't pay for them;
+	# cached_property writes straight into the instance dict, which a frozen class still allows
+
+	# positions of _notes, stored flat alongside them (structure-of-arrays)
+	# so searches and merges don't go through a _NoteRow per comparison
+	@cached_property
+	def _positions(self) -> tuple[Position, ...]:
+		return tuple(r.position for r in self._notes)
+
+	# the same positions scaled by a common denominator to integer ticks,
+	# so that binary search compares plain ints instead of calling Fraction.__lt__
+	@cached_property
+	def _tick_denominator(self) -> int:
+		return lcm(*{p.denominator for p in self._positions})
+
+	@cached_property
+	def _ticks(self) -> tuple[int, ...]:
+		denominator = self._tick_denominator
+		return tuple(p.numerator * (denominator // p.denominator) for p in self._positions)
+
+	@classmethod
+	def _from_sorted(cls, notes: list[_NoteRow[NoteType]], validate: bool = False) -> 'NoteData[NoteType]':
+		'''Construct from rows without sorting them, and by default without validating them either
+
+		Callers MUST already guarantee that the rows are sorted,
+		e.g. because they were derived from an existing object in an order-preserving way.
+		Unless ``validate`` is set, they must also be homogenous and have distinct positions.
+		'''
+		obj = cls.__new__(cls)
+		object.__setattr__(obj, '_notes', notes)
+		object.__setattr__(obj, '_density', None)
+		if validate and not attr.validators.get_disabled():
+			obj.__validate_notes()
+		return obj
+
+	def __from_parts(self, notes: list[_NoteRow], positions: Sequence[Position], ticks: Sequence[int]) -> 'NoteData':
+		'''Like :meth:`_from_sorted`, but reuse arrays cut from this object's own
+
+		Ticks stay over this object's denominator, which remains a common denominator for any subset.
+		'''
+		obj = type(self).__new__(type(self))
+		object.__setattr__(obj, '_notes', notes)
+		object.__setattr__(obj, '_positions', positions)
+		object.__setattr__(obj, '_tick_denominator', self._tick_denominator)
+		object.__setattr__(obj, '_ticks', ticks)
+		object.__setattr__(obj, '_density', None)
+		return obj
+
+	def __validate_notes(self):
+		if len(note_row_lengths := set(map(len, map(attrgetter('notes'), self._notes)))) > 1:
 			raise ValueError(
 				f'note rows have different lengths ({list(note_row_lengths)}) and are not homogenous'
 			)
 
-		for i in range(1, len(notes_list)):
-			prev, curr = notes_list[i - 1], notes_list[i]
-			if prev.position == curr.position:
-				raise IndexError(f'rows {i-1} and {i} have identical position {prev.position}')
-
-	# all the notes stored by this object, in [beat: notes] form
-	_notes: list[_NoteRow[NoteType]] = attr.ib(
-		factory=list, converter=_normalize_notes, validator=__validate_notes
-	)
+		ticks = self._ticks
+		if any(map(eq, ticks, islice(ticks, 1, None))):
+			# only look for where the duplicate is once we know there is one
+			i = next(i for i in range(1, len(ticks)) if ticks[i - 1] == ticks[i])
+			raise IndexError(f'rows {i-1} and {i} have identical position {self._positions[i]}')
 
 	# access
 
@@ -84,26 +147,36 @@ class NoteData(Generic[NoteType]):
 		'''Return the number of note rows'''
 		return len(self._notes)
 
+	def __tick_of(self, position: PositionSafe) -> tuple[int, bool]:
+		'''Return the smallest tick not before position, and whether position lies exactly on it'''
+		if type(position) is int:
+			# whole beats are common keys, and always land on a tick
+			return position * self._tick_denominator, True
+		scaled, remainder = divmod(position.numerator * self._tick_denominator, position.denominator)
+		if remainder:
+			return scaled + 1, False
+		return scaled, True
+
 	def __index_of_row(self, position: PositionSafe) -> int:
 		'''Return n s.t. _notes[n].position = position, or insert location if absent'''
-		lo, hi = 0, len(self._notes)
-		while lo < hi:
-			c = (lo + hi) // 2
-			if self._notes[c].position < position:
-				lo = c + 1
-			else:
-				hi = c
-		return lo
+		return bisect_left(self._ticks, self.__tick_of(position)[0])
+
+	def __index_after_row(self, position: PositionSafe) -> int:
+		'''Return the index of the first row strictly after position'''
+		tick, exact = self.__tick_of(position)
+		return (bisect_right if exact else bisect_left)(self._ticks, tick)
 
 	def __index_of_row_must_exist(self, position: PositionSafe) -> int:
-		i = self.__index_of_row(position)
-		if self._notes[i].position != position:
+		tick, exact = self.__tick_of(position)
+		i = bisect_left(self._ticks, tick)
+		if not exact or i >= len(self._ticks) or self._ticks[i] != tick:
 			raise IndexError
 		return i
 
 	def __contains__(self, position: PositionSafe) -> bool:
-		i = self.__index_of_row(position)
-		return (i < len(self._notes)) and (self._notes[i].position == position)
+		tick, exact = self.__tick_of(position)
+		i = bisect_left(self._ticks, tick)
+		return exact and (i < len(self._ticks)) and (self._ticks[i] == tick)
 
 	@overload
 	def __getitem__(self, key: slice) -> 'NoteData[NoteType]':
@@ -127,31 +200,81 @@ class NoteData(Generic[NoteType]):
 			else:
 				slice_stop = self.__index_of_row(key.stop)
 
-			return attr.evolve(self, notes = self._notes[slice_start:slice_stop])
+			return self.__from_parts(
+				self._notes[slice_start:slice_stop],
+				self._positions[slice_start:slice_stop],
+				self._ticks[slice_start:slice_stop],
+			)
 
 		return self._notes[self.__index_of_row_must_exist(key)].notes
 
-	def __delta_generator(self) -> Iterable[Position]:
-		# TODO this can be public API
-		i = 1
-		while i < len(self._notes):
-			yield self._notes[i].position - self._notes[i - 1].position
-			i += 1
+	def __tick_delta_generator(self) -> Iterable[int]:
+		# TODO this can be public API, as Positions
+		ticks = self._ticks
+		return map(sub, ticks[1:], ticks[:-1])
 
 	def density(self) -> Iterable[DensityInfo]:
 		# TODO docstring
-		return [DensityInfo(k, sum(1 for _ in g)) for k, g in groupby(self.__delta_generator())]
+		density = self._density
+		if density is None:
+			density = tuple(self.__compute_density())
+			object.__setattr__(self, '_density', density)
+		return list(density)
+
+	def __compute_density(self) -> list[DensityInfo]:
+		# uniform spacing (e.g. one long stream or jack) is a single run:
+		# the endpoints rule it out in O(1), and otherwise comparing against a range confirms it in C
+		ticks = self._ticks
+		if len(ticks) > 2:
+			first = ticks[1] - ticks[0]
+			if ticks[-1] - ticks[0] == first * (len(ticks) - 1) and ticks == tuple(range(ticks[0], ticks[-1] + 1, first)):
+				return [DensityInfo(Fraction(first, self._tick_denominator), len(ticks) - 1)]
+
+		# run-length encode on plain ints, and only build a Fraction once per run;
+		# a plain loop beats groupby here, since runs are short and groupby makes an iterator per run
+		runs: list[tuple[int, int]] = []
+		deltas = iter(self.__tick_delta_generator())
+		prev = next(deltas, None)
+		if prev is None:
+			return []
+		count = 1
+		for d in deltas:
+			if d == prev:
+				count += 1
+			else:
+				runs.append((prev, count))
+				prev, count = d, 1
+		runs.append((prev, count))
+		return [DensityInfo(Fraction(d, self._tick_denominator), c) for d, c in runs]
 
 	# mutation
 
 	def shift(self, amount: PositionSafe) -> 'NoteData[NoteType]':
 		'''Shift the positions of this container's notes'''
-		return attr.evolve(self, notes = [_NoteRow(r.position + amount, r.notes) for r in self._notes])
+		# translation preserves order, so there's nothing to sort nor validate;
+		# adding the parts directly builds each Fraction once, skipping the operator dispatch of Fraction.__add__
+		a_num, a_den = amount.numerator, amount.denominator
+		positions = tuple(
+			Fraction(p.numerator * a_den + a_num * p.denominator, p.denominator * a_den) for p in self._positions
+		)
+		rows: list[_NoteRow] = list(map(_NoteRow, positions, map(attrgetter('notes'), self._notes)))
+
+		# the common case: the amount lands on a tick, so the ticks just shift too
+		tick, exact = self.__tick_of(amount)
+		if exact:
+			return self.__from_parts(rows, positions, tuple(t + tick for t in self._ticks))
+		return self._from_sorted(rows)
 
 	def clear_range(self, start: PositionSafe, stop: PositionSafe) -> 'NoteData[NoteType]':
 		'''Remove all notes in the specified half-open range'''
 		antislice_start, antislice_stop = (self.__index_of_row(x) for x in (start, stop))
-		return attr.evolve(self, notes = self._notes[:antislice_start] + self._notes[antislice_stop:])
+		# like slicing, a reversed range is empty; unclamped, the rows between would be kept twice
+		antislice_stop = max(antislice_start, antislice_stop)
+		return self.__from_parts(
+			self._notes[:antislice_start] + self._notes[antislice_stop:],
+			self._positions[:antislice_start] + self._positions[antislice_stop:],
+			self._ticks[:antislice_start] + self._ticks[antislice_stop:],
+		)
 
 	class OverlayMode(Enum):
 		'''Strategies for :meth:`NoteData.overlay` when both containers have notes at the same position'''
@@ -163,49 +286,53 @@ class NoteData(Generic[NoteType]):
 	def overlay(self, other: 'NoteData[NoteType]', mode: OverlayMode = OverlayMode.RAISE) -> 'NoteData[NoteType]':
 		'''Overlay notes onto the ones in this container'''
 
-		if mode == self.OverlayMode.RAISE:
-			return attr.evolve(self, notes = chain(self._notes, other._notes))
 		if not self:
 			return other
 		if not other:
 			return self
 
-		rows = []
-
-		# do a lookup on the starting indices for the merge
-		# to optimize for when the other object occupies a much smaller time range
-		# Because of lookup costs, this is slightly slower if the notedata is small
-		i_s = self.__index_of_row(other._notes[0].position)
-		i_o = 0
-		# i_o = other.__index_of_row(self._notes[0].position)
-		# it'd be more efficient to do other.overlay(self) instead
-		# one or the other must surely be zero
-		rows.extend(self._notes[:i_s])
-		# rows.extend(other._notes[:i_o])
-
-		# bastardized 'merge' of mergesort
-		while i_s < len(self._notes) and i_o < len(other._notes):
-			# print(i_s, i_o)
-			if self._notes[i_s].position < other._notes[i_o].position:
-				rows.append(self._notes[i_s])
-				i_s += 1
-			elif other._notes[i_o].position < self._notes[i_s].position:
-				rows.append(other._notes[i_o])
-				i_o += 1
-			else:
-				if mode == self.OverlayMode.KEEP_SELF:
-					rows.append(self._notes[i_s])
-				else: # elif mode == self.OverlayMode.KEEP_OTHER:
-					rows.append(other._notes[i_o])
-				# unlike merge sort, we only keep one of the elements in a tie
-				i_s += 1
-				i_o += 1
+		if mode == self.OverlayMode.RAISE:
+			# when the time ranges don't overlap, there's no conflict to find and the concatenation is sorted
+			if len(self._notes[0].notes) == len(other._notes[0].notes):
+				if self._positions[-1] < other._positions[0]:
+					return self._from_sorted(self._notes + other._notes)
+				if other._positions[-1] < self._positions[0]:
+					return self._from_sorted(other._notes + self._notes)
+			return attr.evolve(self, notes = chain(self._notes, other._notes))
 
-		# sweep up remaining elements
-		rows.extend(self._notes[i_s:])
-		rows.extend(other._notes[i_o:])
+		# each input is homogenous on its own, so comparing one row from each covers the whole result
+		if (self_width := len(self._notes[0].notes)) != (other_width := len(other._notes[0].notes)):
+			raise ValueError(
+				f'note rows have different lengths ({[self_width, other_width]}) and are not homogenous'
+			)
 
-		return attr.evolve(self, notes = rows)
+		# only the part of self within the other object's time range can interleave with it,
+		# which matters when the other object occupies a much smaller time range
+		i_start = self.__index_of_row(other._positions[0])
+		i_stop = self.__index_after_row(other._positions[-1])
+
+		# merge on integer ticks over a common denominator, so no Fraction comparisons happen:
+		# the dict resolves ties (later updates win), and sorting its int keys restores the order
+		tick_denominator = lcm(self._tick_denominator, other._tick_denominator)
+		s_scale = tick_denominator // self._tick_denominator
+		o_scale = tick_denominator // other._tick_denominator
+		s_rows = zip([t * s_scale for t in self._ticks[i_start:i_stop]], self._notes[i_start:i_stop])
+		o_rows = zip([t * o_scale for t in other._ticks], other._notes)
+
+		if mode == self.OverlayMode.KEEP_SELF:
+			by_tick = dict(o_rows)
+			by_tick.update(s_rows)
+		else: # elif mode == self.OverlayMode.KEEP_OTHER:
+			by_tick = dict(s_rows)
+			by_tick.update(o_rows)
+
+		rows = self._notes[:i_start]
+		rows.extend([by_tick[t] for t in sorted(by_tick)])
+		rows.extend(self._notes[i_stop:])
+
+		# both inputs were valid with the same width, and the merge keeps one row per position,
+		# so the result is valid too
+		return self._from_sorted(rows)
 
 	def column_swap(self, columns: Iterable[int]) -> 'NoteData[NoteType]':
 		'''Swaps the columns of this object.
@@ -221,61 +348,83 @@ class NoteData(Generic[NoteType]):
 		if not isinstance(self._notes[0].notes, str):
 			raise NotImplementedError
 
-		cache = {}
+		# materialize once, since the transform runs once per unique row
+		columns = tuple(columns)
+		if not columns:
+			return self.__from_parts([_NoteRow(r.position, '') for r in self._notes], self._positions, self._ticks)
+		# itemgetter picks all the columns in one C-level call;
+		# with a single column it returns the bare character, which join accepts just the same
+		pick = itemgetter(*columns)
+
+		cache: dict[NoteType, str] = {}
 		rows = []
 		for r in self._notes:
-			if r.notes not in cache:
+			swapped = cache.get(r.notes)
+			if swapped is None:
 				# have to compute the transform fresh
-				cache[r.notes] = ''.join(r.notes[v] for v in columns)
-			rows.append(_NoteRow(r.position, cache[r.notes]))
+				swapped = cache[r.notes] = ''.join(pick(r.notes))
+			rows.append(_NoteRow(r.position, swapped))
+
+		# positions are unchanged, and every row has the same new width
+		return self.__from_parts(rows, self._positions, self._ticks)
 
-		return attr.evolve(self, notes = rows)
+
+# charts in one simfile (and simfiles in one pack) mostly place rows at the same positions,
+# so the same Fractions would otherwise be normalized over and over; they're immutable, so sharing them is safe
+_sm_position = lru_cache(maxsize=4096)(Fraction)
 
 
 def sm_to_notedata(data: str) -> NoteData[str]:
-	measures: list[list[str]] = [m.strip().split() for m in data.split(_SM_TEXT_MEASURE_SEP)]
-	measure_notes: list[list[_NoteRow]] = [
-		[
-			_NoteRow((Fraction(row_index, len(measure)) + measure_index) * _SM_TEXT_BEATS_PER_MEASURE, row)
+	rows: list[_NoteRow] = []
+	for measure_index, measure_text in enumerate(data.split(_SM_TEXT_MEASURE_SEP)):
+		# rests are common, and whole measures of them can be skipped without splitting into rows
+		if not measure_text.strip(_SM_TEXT_EMPTY_MEASURE_CHARS):
+			continue
+		measure = measure_text.split()
+		# positions in units of 1/len(measure) of a measure, so each row needs one Fraction
+		measure_start = measure_index * len(measure)
+		rows.extend(
+			# charts reuse a few dozen row patterns, so interning makes identical rows share one object
+			_NoteRow(_sm_position((measure_start + row_index) * _SM_TEXT_BEATS_PER_MEASURE, len(measure)), intern(row))
 			for row_index, row in enumerate(measure)
 			# filter out empty rows
-			if any(note != '0' for note in row)
-		]
-		for measure_index, measure in enumerate(measures)
-	]
-	return NoteData(chain(*measure_notes))
-
-
-# NOTE blocked py3.9 lcm
-def _lcm(it):
-	curr_lcm = 1
-	for i in it:
-		the_gcd = gcd(curr_lcm, i)
-		curr_lcm //= the_gcd
-		curr_lcm *= i
-	return curr_lcm
+			if row.strip('0')
+		)
+	# measures and the rows within them are visited in order, so the rows come out sorted already
+	return NoteData._from_sorted(rows, validate=True)
 
 
 def notedata_to_sm(data: NoteData[str]) -> str:
-	measures_text: list[str] = []
+	# every row and separator goes into one flat list, so the text is built by a single join at the end
+	lines: list[str] = []
+	measure_count = 0
 	EMPTY_ROW = '0' * len(data._notes[0].notes)
+	EMPTY_MEASURE_LINES = [EMPTY_ROW] * _SM_TEXT_BEATS_PER_MEASURE + [_SM_TEXT_MEASURE_SEP]
+
+	# work on the integer ticks, so no Fraction arithmetic happens per row
+	tick_denominator = data._tick_denominator
+	ticks_per_measure = tick_denominator * _SM_TEXT_BEATS_PER_MEASURE
 
 	# group notes by measure
-	for index, rs in groupby(data._notes, key=lambda r: r.position // _SM_TEXT_BEATS_PER_MEASURE):
-		rows = list(rs)
+	for index, group in groupby(zip(data._ticks, data._notes), key=lambda tr: tr[0] // ticks_per_measure):
+		rows = list(group)
 
 		# fill in missing measures with empty data
-		for _ in range(len(measures_text), index):
-			measures_text.append('\n'.join([EMPTY_ROW] * _SM_TEXT_BEATS_PER_MEASURE))
+		if index > measure_count:
+			lines.extend(EMPTY_MEASURE_LINES * (index - measure_count))
+			measure_count = index
 
 		# set up text array
-		measure_rows_count = (_lcm(r.position.denominator for r in rows) * _SM_TEXT_BEATS_PER_MEASURE)
-		measure_rows = [EMPTY_ROW] * measure_rows_count
-
-		for r in rows:
-			dest_index = (r.position / _SM_TEXT_BEATS_PER_MEASURE % 1) * measure_rows_count
-			assert dest_index.denominator == 1, dest_index
-			measure_rows[dest_index.numerator] = r.notes
-		measures_text.append('\n'.join(measure_rows))
-
-	return ('\n' + _SM_TEXT_MEASURE_SEP + '\n').join(measures_text)
+		# denominators repeat heavily within a measure, so dedupe before the lcm
+		measure_denominator = lcm(*{r.position.denominator for _, r in rows})
+		measure_rows = [EMPTY_ROW] * (measure_denominator * _SM_TEXT_BEATS_PER_MEASURE)
+
+		for tick, r in rows:
+			# exact, since measure_denominator is a multiple of the row's own denominator
+			measure_rows[(tick % ticks_per_measure) * measure_denominator // tick_denominator] = r.notes
+		lines.extend(measure_rows)
+		lines.append(_SM_TEXT_MEASURE_SEP)
+		measure_count += 1
+
+	lines.pop() # no separator after the last measure
+	return '\n'.join(lines)
@@ -3,11 +3,13 @@
 from collections.abc import Mapping as MappingABC
 from decimal import Decimal
 from enum import Enum, auto
-from pathlib import PurePath
+from pathlib import Path, PosixPath, PurePath, PurePosixPath, PureWindowsPath, WindowsPath
 from typing import (
-	Callable, Iterable, Mapping, Optional, Type, TypeVar, Union, cast, get_args, get_origin
+	Any, Callable, Iterable, Mapping, Optional, Type, TypeVar, Union, cast, get_args, get_origin
 )
 
+import attr
+
 from ssc_pkg import msd, notedata
 from .structs import Chart, Simfile, TimingData
 
@@ -49,10 +51,17 @@ def _SM_msd_tables() -> tuple[Mapping[str, str], Mapping[str, str]]:
 	for i in allcaps_easy:
 		table.append((i, i.upper().replace('_', '')))
 
-	return (
-		dict(table),
-		{tag: field for field, tag in table}
-	)
+	items_to_msd = dict(table)
+	msd_to_items = {tag: field for field, tag in table}
+
+	# prefill the converters' fallbacks for every known field,
+	# so converting them is a single lookup with no case conversion
+	for cls in (TimingData, Chart, Simfile):
+		for f in attr.fields(cls):
+			items_to_msd.setdefault(f.name, f.name.upper())
+			msd_to_items.setdefault(f.name.upper(), f.name)
+
+	return items_to_msd, msd_to_items
 
 
 _SM_tables = _SM_msd_tables()
@@ -61,11 +70,17 @@ _SM_msd_to_items: Mapping[str, str] = _SM_tables[1]
 
 
 def _SM_name_converter(name: str) -> str:
-	return _SM_items_to_msd.get(name, name.upper())
+	try:
+		return _SM_items_to_msd[name]
+	except KeyError:
+		return name.upper()
 
 
 def _SM_tag_converter(tag: str) -> str:
-	return _SM_msd_to_items.get(tag, tag.lower())
+	try:
+		return _SM_msd_to_items[tag]
+	except KeyError:
+		return tag.lower()
 
 
 class MSDValueError(ValueError):
@@ -86,6 +101,42 @@ def undo_optional(t: type) -> type:
 	return cast(type, type_args[0] or type_args[1]) # short circuit None
 
 
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class _TypeInfo:
+	'''Reflection results for a field type, so conversions don't redo them per item'''
+	optional: bool
+	concrete: Any # with any Optional removed
+	mapping_args: Optional[tuple[Any, Any]] # key and value types, if concrete is a Mapping
+
+
+def _build_type_info(t) -> _TypeInfo:
+	optional = False
+	try:
+		t = undo_optional(t)
+		optional = True
+	except TypeError:
+		pass
+	mapping_args = get_args(t) if get_origin(t) == MappingABC else None
+	return _TypeInfo(optional, t, cast(Optional[tuple[Any, Any]], mapping_args))
+
+
+_TYPE_INFOS: dict[Any, _TypeInfo] = {
+	f.type: _build_type_info(f.type)
+	for cls in (TimingData, Chart, Simfile)
+	for f in attr.fields(cls)
+}
+
+
+def _type_info(t) -> _TypeInfo:
+	try:
+		return _TYPE_INFOS[t]
+	except KeyError: # not a field type of the known classes; still works, just slowly
+		return _build_type_info(t)
+
+
+_PATH_TYPES = frozenset({PurePath, PurePosixPath, PureWindowsPath, Path, PosixPath, WindowsPath})
+'''the path types a field may be declared as; compared by identity, which is cheaper than ``issubclass``'''
+
 _T_val = TypeVar('_T_val')
 
 
@@ -108,19 +159,17 @@ def _msd_td_mapping(tag: str, key_type, value_type, data: Iterable[tuple[str, st
 
 
 def _msd_to_timing_data_vcv(tag: str, value_type, value: str):
-	try:
-		value_type = undo_optional(value_type)
-	except TypeError:
-		pass
+	info = _type_info(value_type)
+	value_type = info.concrete
 
-	if get_origin(value_type) == MappingABC:
+	if info.mapping_args is not None:
 		value = value.strip()
 		if not value:
 			return {}
-		key_type, val_type = get_args(value_type)
+		key_type, val_type = info.mapping_args
 		data = [
 			cast(tuple[str, str], v.strip().split('=', 1)) # split only ever returns max len 2
-			for v in value.strip().split(',')
+			for v in value.split(',')
 		]
 		return _msd_td_mapping(tag, key_type, val_type, data)
 	if value_type is str or value_type is Decimal:
@@ -137,16 +186,32 @@ def _msd_to_timing_data(items: Iterable[msd.MSDItem]):
 	)
 
 
+_TIMING_DATA_FIELDS = frozenset(attr.fields_dict(TimingData))
+
+_IGNORED_HEADER_TAGS = frozenset({'VERSION'})
+_IGNORED_CHART_TAGS = frozenset({'RADARVALUES'}) # not (yet) relevant
+
+
+def _split_timing_items(
+	items: Iterable[msd.MSDItem], ignored: frozenset[str]
+) -> tuple[list[msd.MSDItem], list[msd.MSDItem]]:
+	'''Partition items into timing data items and the rest, dropping ignored tags in the same pass'''
+	timing_items, rest = [], []
+	for item in items:
+		if _SM_tag_converter(item.tag) in _TIMING_DATA_FIELDS:
+			timing_items.append(item)
+		elif item.tag not in ignored:
+			rest.append(item)
+	return timing_items, rest
+
+
 def _timing_data_to_msd_vcv(name: str, value_type: Type[_T_val], value: _T_val) -> str:
 	# None should not be emitted
-	try:
-		value_type = undo_optional(value_type)
-	except TypeError:
-		pass
 	assert value is not None
 
-	if isinstance(value, MappingABC):
-		return ',\n'.join(f'{k}={v}' for k, v in value.items())
+	if _type_info(value_type).mapping_args is not None:
+		# !s skips the format() protocol, which is much slower than str() for Decimal
+		return ',\n'.join([f'{k!s}={v!s}' for k, v in cast(Mapping, value).items()])
 
 	return str(value)
 
@@ -163,12 +228,9 @@ def _timing_data_to_msd(timing_data: TimingData) -> Iterable[msd.MSDItem]:
 # # Chart
 
 def _msd_to_chart_vcv(tag: str, value_type, value: str):
-	try:
-		value_type = undo_optional(value_type)
-	except TypeError:
-		pass
+	value_type = _type_info(value_type).concrete
 
-	if issubclass(value_type, notedata.NoteData):
+	if value_type is notedata.NoteData:
 		return notedata.sm_to_notedata(value)
 	if value_type is int or value_type is str:
 		return value_type(value)
@@ -183,19 +245,18 @@ def _msd_to_chart(items: Iterable[msd.MSDItem]) -> Chart:
 		value_converter = _msd_to_chart_vcv
 	)
 	if excess:
-		# not (yet) relevant
-		excess = list(filter(lambda x: x.tag != 'RADARVALUES', excess))
-	if excess:
+		timing_items, excess = _split_timing_items(excess, _IGNORED_CHART_TAGS)
+		if excess:
+			raise MSDValueError(f"extraneous tags '{[e.tag for e in excess]}' in chart")
 		# don't create chart-specific timing unless we're sure we need it
-		chart.timing_data, excess = _msd_to_timing_data(excess)
-	if excess:
-		raise MSDValueError(f"extraneous tags '{[e.tag for e in excess]}' in chart")
+		if timing_items:
+			chart.timing_data, _ = _msd_to_timing_data(timing_items)
 	return chart
 
 
 def _chart_to_msd_vcv(name: str, value_type: Type[_T_val], value: _T_val) -> str:
-	if isinstance(value, notedata.NoteData):
-		return ''.join(['\n', notedata.notedata_to_sm(value), '\n'])
+	if value_type is notedata.NoteData:
+		return ''.join(['\n', notedata.notedata_to_sm(cast(notedata.NoteData, value)), '\n'])
 	return str(value)
 
 
@@ -216,14 +277,10 @@ def _chart_to_msd(chart: Chart) -> Iterable[msd.MSDItem]:
 # # Simfile (only direct fields and TimingData field object)
 
 def _msd_to_simfile_skel_vcv(tag: str, value_type, value: str):
-	is_optional = False
-	try:
-		value_type = undo_optional(value_type)
-		is_optional = True
-	except TypeError:
-		pass
+	info = _type_info(value_type)
+	value_type, is_optional = info.concrete, info.optional
 
-	if issubclass(value_type, PurePath) or value_type is str:
+	if value_type in _PATH_TYPES or value_type is str:
 		if is_optional and not value:
 			# swallow empty optional strings, and prevent empty paths from turning into spurious '.'
 			return None
@@ -238,11 +295,10 @@ def _msd_to_simfile_skel(items: Iterable[msd.MSDItem]) -> Simfile:
 		tag_converter = _SM_tag_converter,
 		value_converter = _msd_to_simfile_skel_vcv
 	)
-	simfile.timing_data, excess = _msd_to_timing_data(excess)
-	if excess:
-		excess = list(filter(lambda x: 'VERSION' not in x.tag, excess))
+	timing_items, excess = _split_timing_items(excess, _IGNORED_HEADER_TAGS)
 	if excess:
 		raise MSDValueError(f"extraneous tags '{[e.tag for e in excess]}' in simfile header")
+	simfile.timing_data, _ = _msd_to_timing_data(timing_items)
 	return simfile
 
 
@@ -250,18 +306,16 @@ def _simfile_skel_to_msd(
 	simfile: Simfile,
 	version_tag: Optional[msd.MSDItem] = msd.MSDItem('VERSION', '0.83')
 ) -> Iterable[msd.MSDItem]:
-	items: list[msd.MSDItem] = []
 	if version_tag is not None:
-		items.append(version_tag)
-	items.extend(msd.attrs_obj_to_msd(
+		yield version_tag
+	yield from msd.attrs_obj_to_msd(
 		simfile,
 		name_converter = _SM_name_converter,
 		# everything is str-convertible!
 		filterer = lambda n, _, v: (n not in {'timing_data', 'charts'}) and (v is not None) # type: ignore
 		# mypy-generic-fn
-	))
-	items.extend(_timing_data_to_msd(simfile.timing_data))
-	return items
+	)
+	yield from _timing_data_to_msd(simfile.timing_data)
 
 
 # Simfile (whole object)
@@ -343,6 +397,13 @@ def text_to_simfile(text: Union[str, Iterable[str]]) -> Simfile: # noqa: C901
 
 SM_INDENT = '     ' # why is the convention this particular string?
 
+_SM_CHART_FIELDS_TEMPLATE = (
+	'\n'
+	+ f'{SM_INDENT}{{}}{msd.MSDItem.END_TAG}\n' * 4 # game type, description, difficulty, meter
+	+ f'{SM_INDENT}0,0,0,0,0{msd.MSDItem.END_TAG}\n' # hardcoded radar values
+)
+''':meth:`str.format` template for the fields preceding the note data of a sm NOTES item'''
+
 
 def _chart_header(_: Chart) -> str:
 	return '\n// ' + ('-' * 30) + '\n'
@@ -356,15 +417,10 @@ def simfile_to_sm(sf: Simfile) -> str:
 	text.append(msd.msd_to_text(_simfile_skel_to_msd(sf)))
 
 	for c in sf.charts:
-		notes = (
-			'\n'
-			f'{SM_INDENT}{c.game_type}{msd.MSDItem.END_TAG}\n'
-			f'{SM_INDENT}{c.description}{msd.MSDItem.END_TAG}\n'
-			f'{SM_INDENT}{c.difficulty}{msd.MSDItem.END_TAG}\n'
-			f'{SM_INDENT}{c.meter}{msd.MSDItem.END_TAG}\n'
-			f'{SM_INDENT}0,0,0,0,0{msd.MSDItem.END_TAG}\n' # hardcoded radar values
+		notes = _SM_CHART_FIELDS_TEMPLATE.format(
+			c.game_type, c.description, c.difficulty, c.meter
 		) + notedata.notedata_to_sm(c.notes)
-		text.extend([str(msd.MSDItem('NOTES', notes)), ''])
+		text.append(str(msd.MSDItem('NOTES', notes)))
 
 	return ''.join(text)
 
@@ -373,8 +429,9 @@ def simfile_to_ssc(sf: Simfile) -> str:
 	text: list[str] = []
 	text.append(msd.msd_to_text(_simfile_skel_to_msd(sf)))
 
+	# one join over every line, instead of an intermediate string per chart
 	for c in sf.charts:
 		text.append(_chart_header(c))
-		text.append(msd.msd_to_text(_chart_to_msd(c)))
+		text.extend(msd.msd_to_lines(_chart_to_msd(c)))
 
 	return ''.join(text)
@@ -12,10 +12,10 @@ _TimingPosition = Decimal # somewhat tied to SM
 
 # class definitions
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class TimingData:
 	'''Timing data (e.g. BPM, stops) of (possibly part of) a simfile'''
-	@attr.s(auto_attribs=True)
+	@attr.s(auto_attribs=True, slots=True)
 	class ComboMultiplier:
 		'''combo multiplier timing segment'''
 		hit: int
@@ -51,7 +51,7 @@ class TimingData:
 	attacks: Optional[str] = None # TODO unsupported
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Chart:
 	'''Chart with notes and metadata'''
 
@@ -76,7 +76,7 @@ class Chart:
 	notes: notedata.NoteData = attr.Factory(notedata.NoteData)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Simfile:
 	'''Song and artist display metadata, and associated charts'''
 
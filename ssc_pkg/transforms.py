@@ -1,13 +1,25 @@
+import logging
+import os
 import re
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import ClassVar, Mapping, Optional
 
 from . import simfile
 from .transform import abc
 from .make import MakeTransform
 
 
+_DIFFICULTY_ABBREVIATIONS: Mapping[Optional[str], str] = {
+	'Beginner': 'N', # ITG: Novice
+	'Easy': 'E',
+	'Medium': 'M',
+	'Hard': 'H',
+	'Challenge': 'X', # ITG: eXpert
+	'Edit': '',
+}
+
+
 def _chart_str(chart: simfile.Chart) -> str:
 	# NOTE this logs like ITG, e.g. SX14
 	# DDR uses [BSEC][SD]P[number]
@@ -15,18 +27,10 @@ def _chart_str(chart: simfile.Chart) -> str:
 	game_type = chart.game_type
 	if 'single' in game_type:
 		game_type = 'S'
-	if 'double' in game_type:
+	elif 'double' in game_type:
 		game_type = 'D'
 
-	difficulty_mapping: dict = {
-		'Beginner': 'N', # ITG: Novice
-		'Easy': 'E',
-		'Medium': 'M',
-		'Hard': 'H',
-		'Challenge': 'X', # ITG: eXpert
-		'Edit': '',
-	}
-	difficulty = difficulty_mapping.get(chart.difficulty, '?')
+	difficulty = _DIFFICULTY_ABBREVIATIONS.get(chart.difficulty, '?')
 
 	descriptors = list(filter(None, [chart.description, chart.credit]))
 	if len(descriptors) == 0:
@@ -62,22 +66,27 @@ class OggConvert(abc.FileTransform, abc.Cleanable):
 			self.logger.warning('no audio file specified')
 			return None
 
-		old_music = target.parent / Path(sim.music)
+		# checked before existence, since there's nothing to do either way
+		if sim.music.suffix.lower() == '.ogg':
+			# assume it's not lying
+			# TODO check: "Vorbis audio" in `file (old_music)`
+			self.logger.info('audio is already Ogg Vorbis, doing nothing')
+			return None
+		old_music = target.parent / sim.music
 		if not old_music.exists():
 			# TODO what if transform on a different simfile in the folder already clobbered the audio?
 			self.logger.error(
 				f"audio file '{sim.music}' does not exist"
 			)
 			return None
-		if old_music.suffix.lower() == '.ogg':
-			# assume it's not lying
-			# TODO check: "Vorbis audio" in `file (old_music)`
-			self.logger.info('audio is already Ogg Vorbis, doing nothing')
-			return None
 
 		try:
 			# modify
-			subprocess.run(["oggenc", "--quality=8", str(old_music)], capture_output=True, check=True)
+			# only stderr is ever read (on failure), so stdout is discarded rather than captured
+			subprocess.run(
+				["oggenc", "--quality=8", str(old_music)],
+				stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True
+			)
 		except subprocess.CalledProcessError as exc:
 			self.logger.error(f'oggenc failed with return code {exc.returncode} and stderr as follows:\n{exc.stderr}')
 			raise
@@ -126,13 +135,20 @@ class DemoMeta(abc.MetaTransform):
 
 
 class NameRegex(abc.FileTransform):
+	# TODO customizable?
+	_NAME_REGEX: ClassVar[re.Pattern] = re.compile(r'[a-z0-9\-_.]*')
+
 	def transform(self, _, target: Path):
 		'''Check that all file names in the folder exactly match regex.'''
-		# TODO customizable?
-		regex: re.Pattern = re.compile(r'[a-z0-9\-_.]*')
+		regex = self._NAME_REGEX
+
+		with os.scandir(target.parent) as entries:
+			names = [e.name for e in entries]
 
-		for child in target.parent.iterdir():
-			name = child.name
+		for name in names:
+			if regex.fullmatch(name):
+				continue
+			child = target.parent / name
 			m = regex.match(name)
 			if (not m) or m.end() == 0:
 				self.logger.warning(
@@ -153,17 +169,23 @@ class NeatOffset(abc.SimfileTransform):
 		This makes it easy to tell at a glance whether the ITG offset was applied or not,
 		and if that is done automatically, this transform should be earlier.
 		'''
+		# this transform only reports, so there is nothing to do (nor any chart descriptions to build) when quiet
+		if not self.logger.isEnabledFor(logging.WARNING):
+			return
+
 		if sim.timing_data.offset % 1 != 0:
 			self.logger.warning(
 				f"simfile offset {sim.timing_data.offset} is messy"
 			)
-		for chart in sim.charts:
-			if not chart.timing_data:
-				continue
-			if chart.timing_data.offset % 1 != 0:
-				self.logger.warning(
-					f"chart {_chart_str(chart)} offset {chart.timing_data.offset} is messy"
-				)
+		# collect the offending charts in one pass, then report them
+		messy = [
+			(chart, chart.timing_data.offset) for chart in sim.charts
+			if chart.timing_data and chart.timing_data.offset % 1 != 0
+		]
+		for chart, offset in messy:
+			self.logger.warning(
+				f"chart {_chart_str(chart)} offset {offset} is messy"
+			)
 
 
 MakeTransform = MakeTransform
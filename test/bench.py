@@ -1,30 +1,38 @@
 #!/usr/bin/env python3
 
+from time import perf_counter_ns
 from timeit import Timer
 import sys
 
+import attr
+
+
+def _times(stmt: str, setup: str, repeats: int) -> list[float]:
+	'''seconds taken by each of 10 runs of repeats executions, timed in integer nanoseconds'''
+	return [ns / 1e9 for ns in Timer(stmt, setup, timer=perf_counter_ns).repeat(10, repeats)]
+
+
 if __name__ == '__main__':
+	# once for the whole process, instead of in every timer's setup
+	attr.set_run_validators(False)
+
 	TEST_SIZE = int(sys.argv[1])
 	REPEATS = max(10000 // TEST_SIZE, 1)
 	setup = '''
 from ssc_pkg import notedata
 ssc = '0001\\n0001\\n0001\\n0002\\n,\\n' * 25000 + '0001\\n0001\\n0001\\n0002'
-import attr
-attr.set_run_validators(False)
 	'''
 
-	# print('sm to notedata: {:.4e}'.format(min(Timer('notedata.sm_to_notedata(ssc)', setup).repeat(10, 1))))
+	# print('sm to notedata: {:.4e}'.format(min(_times('notedata.sm_to_notedata(ssc)', setup, 1))))
 
 	setup = f'''
 from ssc_pkg import notedata
 from fractions import Fraction
 a = [notedata._NoteRow(Fraction(i, 4), '0000') for i in range({TEST_SIZE})]
-import attr
-attr.set_run_validators(False)
 	'''
 	print(
 		'direct notedata (ordered): {:.3e}'.format(
-			min(Timer('v = notedata.NoteData(a)', setup).repeat(10, REPEATS))
+			min(_times('v = notedata.NoteData(a)', setup, REPEATS))
 		)
 	)
 
@@ -53,7 +61,7 @@ attr.set_run_validators(False)
 	]
 
 	for i in d:
-		result = Timer(i[2], setup + '\n' + i[1] + '\n').repeat(10, REPEATS)
+		result = _times(i[2], setup + '\n' + i[1] + '\n', REPEATS)
 		print(
 			f'{i[0]}:  '
 			f'lowest: {min(result) / REPEATS:.3e}, median: {sorted(result)[len(result) // 2] / REPEATS:.3e}'
@@ -35,10 +35,12 @@ class TestManagerObj(unittest.TestCase):
 
 	def mgr_run(self, command: c.Command):
 		'''convenience method to run commands without a simfile attached'''
-		self.manager.run(command, Simfile())
+		self.manager.run(command, self.simfile)
 
 	def setUp(self):
 		self.manager = Manager()
+		# none of these commands touch the simfile, so one blank one per test is enough
+		self.simfile = Simfile()
 
 	def test_lookup(self):
 		self.assertRaises(KeyError, lambda: self.manager.lookup('v'))
@@ -68,8 +70,9 @@ class TestManagerObj(unittest.TestCase):
 			for item in collection:
 				self.mgr_run(c.Pragma('echo', item))
 		self.assertEqual(len(lm.output), len(collection))
-		for i in range(len(collection)):
-			self.assertIn(str(collection[i]), lm.output[i])
+		for item, output in zip(collection, lm.output):
+			with self.subTest(item=item):
+				self.assertIn(str(item), output)
 
 	def test_run_pragma_vars(self):
 		with self.assertLogs(self.manager.logger) as lm:
@@ -117,9 +120,11 @@ class TestManagerObj(unittest.TestCase):
 		self.mgr_run(c.Def('run_def_call_simple', commands))
 
 		self.assertEqual([], ctx_def.buf) # we haven't run any commands yet
+		# earlier calls were already checked, so only the newly appended run needs comparing
 		for i in range(1, 6):
 			self.mgr_run(c.Call('run_def_call_simple'))
-			self.assertEqual(ctx_single.buf * i, ctx_def.buf)
+			self.assertEqual(len(ctx_def.buf), len(ctx_single.buf) * i)
+			self.assertEqual(ctx_def.buf[-len(ctx_single.buf):], ctx_single.buf)
 
 	def test_run_def_call_scope_visibility(self):
 		'''Test that objects defined within Group scopes are not visible outside'''
@@ -151,8 +156,9 @@ class TestManagerObj(unittest.TestCase):
 		}
 
 		for name, value in value_test.items():
-			self.mgr_run(c.Let(name, value))
-			self.assertEqual(self.manager.frames[-1].variables[name], value)
+			with self.subTest(name=name):
+				self.mgr_run(c.Let(name, value))
+				self.assertEqual(self.manager.frames[-1].variables[name], value)
 
 	def test_run_let_scope_shadowing(self):
 		'''Test that objects defined within scopes shadow objects defined outside the scope'''
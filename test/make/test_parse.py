@@ -1,6 +1,8 @@
 import unittest
 from fractions import Fraction
-from typing import Any, Iterable, Mapping, Sequence, Type
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Mapping, Sequence, Type
 
 import attr
 
@@ -67,27 +69,25 @@ class ErrorIndex:
 			self.test.assertIsInstance(e, self.wrap_exc_type)
 			e = e.__cause__
 		self.test.assertIsInstance(e, self.root_exc_type)
-		exc_indices: list = sum((p[0] for p in exc_index_trace(exc_value)), [])
+		exc_indices = list(chain.from_iterable(p[0] for p in exc_index_trace(exc_value)))
 		self.test.assertEqual(exc_indices, self.indices)
 		return True
 
 
-def types_except(*types: type) -> Iterable[type]:
-	'''Returns all the types in :const:`EXAMPLE_OBJS` except for the ones specified'''
-	type_set = set(types)
-	for t in EXAMPLE_OBJS:
-		if t not in type_set:
-			yield t
+@lru_cache
+def examples_except(*types: type) -> Sequence[tuple[type, Any]]:
+	'''Returns ``(type, value)`` for all the objects in :const:`EXAMPLE_OBJS` except those of the types specified'''
+	return tuple((t, v) for t, vs in EXAMPLE_OBJS.items() if t not in types for v in vs)
 
 
 class TestParse(unittest.TestCase):
 	def _easy_helper(self, input_type: type, check_fn):
 		for v in EXAMPLE_OBJS[input_type]:
-			self.assertEqual(check_fn(v), v)
-		for t in types_except(input_type):
-			for v in EXAMPLE_OBJS[t]:
-				with self.assertRaises(TypeError, msg=str(v)):
-					check_fn(v)
+			with self.subTest(v=v):
+				self.assertEqual(check_fn(v), v)
+		for t, v in examples_except(input_type):
+			with self.subTest(t=t, v=v), self.assertRaises(TypeError):
+				check_fn(v)
 
 	def test_check_get_u(self):
 		# even though the index type isn't strictly supported,
@@ -134,22 +134,24 @@ class TestParse(unittest.TestCase):
 		for s, ex in EXAMPLE_PARSE_FRACTIONS.items():
 			for pos in ['', '+', '+ ']:
 				the = pos + s
-				self.assertEqual(p.parse_Fraction(the), ex, the)
+				with self.subTest(the=the):
+					self.assertEqual(p.parse_Fraction(the), ex)
 			for neg in ['-', '- ']:
 				the = neg + s
-				self.assertEqual(p.parse_Fraction(the), -ex, the)
+				with self.subTest(the=the):
+					self.assertEqual(p.parse_Fraction(the), -ex)
 
 		for v in EXAMPLE_OBJS[int]:
-			self.assertEqual(p.parse_Fraction(v), Fraction(v))
+			with self.subTest(v=v):
+				self.assertEqual(p.parse_Fraction(v), Fraction(v))
 
 	def test_parse_fraction_fail(self):
 		for v in EXAMPLE_OBJS[str]:
-			with self.assertRaises(ValueError, msg=str(v)):
+			with self.subTest(v=v), self.assertRaises(ValueError):
+				p.parse_Fraction(v)
+		for t, v in examples_except(str, int):
+			with self.subTest(t=t, v=v), self.assertRaises(TypeError):
 				p.parse_Fraction(v)
-		for t in types_except(str, int):
-			for v in EXAMPLE_OBJS[t]:
-				with self.assertRaises(TypeError, msg=str(v)):
-					p.parse_Fraction(v)
 
 	def test_parse_scalar(self):
 		for i in EXAMPLE_OBJS[int]:
@@ -158,29 +160,28 @@ class TestParse(unittest.TestCase):
 			self.assertEqual(p.parse_scalar(s), s)
 		for fs, f in EXAMPLE_PARSE_FRACTIONS.items():
 			self.assertEqual(p.parse_scalar(fs), f)
-		for t in types_except(int, str):
-			for v in EXAMPLE_OBJS[t]:
-				with self.assertRaises(TypeError, msg=str(v)):
-					p.parse_scalar(v)
+		for t, v in examples_except(int, str):
+			with self.subTest(t=t, v=v), self.assertRaises(TypeError):
+				p.parse_scalar(v)
 
 	def test_parse_ChartPoint(self):
 		for pr, (ci, base) in EXAMPLE_PARSE_CHARTPOINT_PREFIXES.items():
 			for fs, f in EXAMPLE_PARSE_FRACTIONS.items():
 				ex = c.ChartPoint(chart_index = ci, base = base, offset = f)
-				self.assertEqual(p.parse_ChartPoint(pr + fs), ex)
+				with self.subTest(text=pr + fs):
+					self.assertEqual(p.parse_ChartPoint(pr + fs), ex)
 
 	def test_parse_ChartPoint_fail(self):
 		for s in EXAMPLE_OBJS[str]:
-			with self.assertRaises(ValueError, msg=s):
+			with self.subTest(v=s), self.assertRaises(ValueError):
 				p.parse_ChartPoint(s)
 			for fs in EXAMPLE_PARSE_FRACTIONS:
 				v = fs + s
-				with self.assertRaises(ValueError, msg=v):
-					p.parse_ChartPoint(v)
-		for t in types_except(str):
-			for v in EXAMPLE_OBJS[t]:
-				with self.assertRaises(TypeError, msg=str(v)):
+				with self.subTest(v=v), self.assertRaises(ValueError):
 					p.parse_ChartPoint(v)
+		for t, v in examples_except(str):
+			with self.subTest(t=t, v=v), self.assertRaises(TypeError):
+				p.parse_ChartPoint(v)
 
 	def test_parse_ChartRegion(self):
 		a = c.ChartPoint(chart_index = 2, base = c.VarRef('fc'), offset = Fraction(-39, 10))
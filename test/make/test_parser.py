@@ -1,6 +1,6 @@
 import unittest
 from fractions import Fraction
-from typing import Any, Callable, Sequence, Type, TypeVar
+from typing import Any, Callable, ClassVar, Sequence, Type, TypeVar
 
 import ssc_pkg.make.commands as c
 from ssc_pkg.make.parser import ParseError, Parser
@@ -21,6 +21,8 @@ class TestParser(unittest.TestCase):
 	assertRaises doesn't work with chained exceptions.
 	'''
 
+	parser: ClassVar[Parser]
+
 	def _test_parse_group(
 		self,
 		parse_obj: Callable[[Any], Any],
@@ -58,8 +60,12 @@ class TestParser(unittest.TestCase):
 			with ErrorIndex(self, ParseError, TypeError, indices):
 				self.parser.parse_command(parse_obj(v))
 
+	@classmethod
+	def setUpClass(cls):
+		# parsers hold no state between commands, so one serves every test
+		cls.parser = Parser()
+
 	def setUp(self):
-		self.parser = Parser()
 		self.simple_pragma_obj = {'pragma': 'TEST'}
 		self.simple_pragma_cmd = c.Pragma('TEST', None)
 
@@ -72,10 +78,11 @@ class TestParser(unittest.TestCase):
 		obj[1] = obj
 
 		self.assertEqual(self.parser.parse_command(self.simple_pragma_obj), self.simple_pragma_cmd)
-		self.assertEqual(
-			self.parser.parse_command({'pragma': 'TEST', 'data': obj}),
-			c.Pragma('TEST', obj)
-		)
+		# the data is passed through as-is; identity avoids a recursive compare of the cyclic list
+		result = self.parser.parse_command({'pragma': 'TEST', 'data': obj})
+		assert isinstance(result, c.Pragma)
+		self.assertEqual(result.name, 'TEST')
+		self.assertIs(result.data, obj)
 		self.assertEqual(
 			self.parser.parse_command('pragma % blah blah blah % blah % blah 2'),
 			c.Pragma('blah blah blah', ['blah', 'blah 2'])
@@ -170,7 +177,8 @@ class TestParser(unittest.TestCase):
 			{'not_a_command': 'unittest'},
 		]
 		for bad in collection:
-			self.assertRaises(TypeError, self.parser.parse_command, bad)
+			with self.subTest(bad=bad):
+				self.assertRaises(TypeError, self.parser.parse_command, bad)
 
 		invalid_strings = [
 			'',
@@ -178,4 +186,5 @@ class TestParser(unittest.TestCase):
 			'junk''%''unknown',
 		]
 		for s in invalid_strings:
-			self.assertRaises(ValueError, self.parser.parse_command, s)
+			with self.subTest(s=s):
+				self.assertRaises(ValueError, self.parser.parse_command, s)
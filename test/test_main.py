@@ -0,0 +1,125 @@
+import os
+import unittest
+from argparse import Namespace
+from pathlib import Path, PurePosixPath
+from tempfile import TemporaryDirectory
+from threading import Event
+from typing import ClassVar
+from unittest.mock import patch
+
+import attr
+
+from ssc_pkg import main, simfile, transforms
+from ssc_pkg.transform import abc
+
+
+class _Record(abc.SimfileTransform):
+	'''records the title of every simfile it sees, slowly enough that workers stay busy'''
+	seen: ClassVar[list[str]] = []
+
+	def transform(self, sim: simfile.Simfile) -> None:
+		Event().wait(0.05)
+		self.seen.append(sim.title)
+
+
+class _FailFirst(abc.SimfileTransform):
+	'''fails on the first folder, and records the rest'''
+	seen: ClassVar[list[str]] = []
+
+	def transform(self, sim: simfile.Simfile) -> None:
+		if sim.title == 'f0':
+			raise RuntimeError('failed on purpose')
+		Event().wait(0.05)
+		self.seen.append(sim.title)
+
+
+class TestRunTransform(unittest.TestCase):
+
+	def setUp(self):
+		self.tempdir = TemporaryDirectory()
+		self.addCleanup(self.tempdir.cleanup)
+		self.input_dir = Path(self.tempdir.name) / 'in'
+		self.output_dir = Path(self.tempdir.name) / 'out'
+		self.text = (Path(__file__).parent / 'easy.ssc').read_text(encoding='utf-8')
+
+		_Record.seen = []
+		_FailFirst.seen = []
+		patcher = patch.dict(transforms.__dict__, {'_Record': _Record, '_FailFirst': _FailFirst})
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def _write_simfile(self, folder: str, music: str = 'doesntexist.ogg') -> Path:
+		'''write a simfile titled after its folder to both trees, returning the original'''
+		sf = simfile.text_to_simfile(self.text)
+		sf.title = folder
+		sf.music = PurePosixPath(music)
+		text = simfile.simfile_to_ssc(sf)
+		for base in (self.input_dir, self.output_dir):
+			(base / folder).mkdir(parents=True, exist_ok=True)
+			(base / folder / 'song.ssc').write_text(text, encoding='utf-8')
+		return self.input_dir / folder / 'song.ssc'
+
+	def _run(self, simfiles: list[Path], names: list[str], jobs: int):
+		args = Namespace(input_dir=self.input_dir, output_dir=self.output_dir, transforms=names, jobs=jobs)
+		main._run_transform(args, simfiles)
+
+	def test_jobs_run_every_transform(self):
+		simfiles = [self._write_simfile(f'f{i}') for i in range(5)]
+		self._run(simfiles, ['Nothing', '_Record'], jobs=2)
+		self.assertEqual(sorted(_Record.seen), [f'f{i}' for i in range(5)])
+
+	def test_jobs_failure_stops_queued_folders(self):
+		simfiles = [self._write_simfile(f'f{i}') for i in range(8)]
+		with self.assertRaises(RuntimeError), self.assertLogs(level='ERROR'):
+			self._run(simfiles, ['Nothing', '_FailFirst'], jobs=2)
+		# only the folder in flight beside the failing one (and at most one more picked up
+		# before the failure was seen) may still finish; the rest of the queue is dropped
+		self.assertLessEqual(len(_FailFirst.seen), 2)
+
+	def test_shared_file_groups(self):
+		# a and b both reference audio in a sibling folder, so they can't be transformed at the same time
+		simfiles = [
+			self._write_simfile('a', '../shared/song.wav'),
+			self._write_simfile('b', '../shared/song.wav'),
+			self._write_simfile('c'),
+		]
+		pairs = [(self.output_dir / s.relative_to(self.input_dir), s) for s in simfiles]
+		caches: dict = {}
+		groups = main._shared_file_groups(pairs, caches)
+		self.assertCountEqual(groups, [pairs[:2], pairs[2:]])
+		# the parses used for grouping are kept for the transforms
+		self.assertCountEqual(caches, [target for target, _ in pairs])
+
+
+class TestSimfileCache(unittest.TestCase):
+
+	class _Retitle(abc.SimfileTransform):
+		'''returns a new simfile whose title has the same length, so the file size doesn't change'''
+		def transform(self, sim: simfile.Simfile) -> simfile.Simfile:
+			return attr.evolve(sim, title=sim.title.upper())
+
+	def setUp(self):
+		self.tempdir = TemporaryDirectory()
+		self.addCleanup(self.tempdir.cleanup)
+		self.target = Path(self.tempdir.name) / 'song.ssc'
+		# written as the runner would write it, so a rewrite of the same data has the same size
+		original = simfile.text_to_simfile((Path(__file__).parent / 'easy.ssc').read_text(encoding='utf-8'))
+		self.target.write_text(simfile.simfile_to_ssc(original), encoding='utf-8')
+		self.cache: dict = {}
+
+	def test_none_result_reuses_parse(self):
+		main._run_transform_action(transforms.Nothing(), self.target, self.target, self.cache)
+		(parsed,) = self.cache.values()
+		with patch.object(simfile, 'text_to_simfile', side_effect=AssertionError('reparsed')):
+			self.assertIs(main._load_simfile(self.target, self.cache), parsed)
+
+	def test_runner_rewrite_forces_reparse(self):
+		title = main._load_simfile(self.target, self.cache).title
+		stat = self.target.stat()
+		main._run_transform_action(self._Retitle(), self.target, self.target, self.cache)
+
+		# fake a coarse-timestamp filesystem, where the same-size rewrite keeps the key of the old parse
+		os.utime(self.target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+		self.assertEqual(self.target.stat().st_size, stat.st_size)
+
+		self.assertEqual(main._load_simfile(self.target, self.cache).title, title.upper())
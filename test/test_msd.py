@@ -1,5 +1,7 @@
 import unittest
+from itertools import count
 from numbers import Number
+from typing import ClassVar
 
 import attr
 
@@ -15,19 +17,22 @@ class TestMSD(unittest.TestCase):
 		a_string: str
 		a_list: list
 
-	def setUp(self):
-		self.some_text = '\n'.join([
-			'#SIMPLETAG:SIMPLEVALUE;',
-			'#LONGTAGTHANKSplzzzzzzzzzzzzzzzzzzzz:SHORTVALUE;',
-			'#ATAG:VALUE',
-			'ON',
-			'FOUR',
-			'LINES;',
-			'', # force \n at end
-		])
+	# immutable, so built once for the class instead of per test
+	some_text: ClassVar[str] = '\n'.join([
+		'#SIMPLETAG:SIMPLEVALUE;',
+		'#LONGTAGTHANKSplzzzzzzzzzzzzzzzzzzzz:SHORTVALUE;',
+		'#ATAG:VALUE',
+		'ON',
+		'FOUR',
+		'LINES;',
+		'', # force \n at end
+	])
+
+	lower_alpha: ClassVar[str] = ''.join(chr(c + ord('a')) for c in range(26))
+	unicode_range: ClassVar[str] = ''.join(chr(c) for c in range(400, 10000, 44))
 
-		lower_alpha = ''.join(chr(c + ord('a')) for c in range(26))
-		unicode_range = ''.join(chr(c) for c in range(400, 10000, 44))
+	def setUp(self):
+		lower_alpha, unicode_range = self.lower_alpha, self.unicode_range
 
 		self.msd_items = [
 			MSDItem('tag', 'value'),
@@ -37,7 +42,8 @@ class TestMSD(unittest.TestCase):
 
 		self.simple = self.Simple(400, lower_alpha + '\n\n\n\n\n\n' + unicode_range, [2, 6, 5, 8, 68])
 
-		self.simple_msd = [MSDItem(k, str(v)) for k, v in attr.asdict(self.simple).items()]
+		# straight from the fields, since asdict would deep copy the list just to stringify it
+		self.simple_msd = [MSDItem(f.name, str(getattr(self.simple, f.name))) for f in attr.fields(self.Simple)]
 
 	def test_msd_item_str(self):
 		for i in self.msd_items:
@@ -52,6 +58,19 @@ class TestMSD(unittest.TestCase):
 		self.assertEqual(msd_items[1].value, 'SHORTVALUE')
 		self.assertEqual(msd_items[2].value, '\n'.join(['VALUE', 'ON', 'FOUR', 'LINES']))
 
+	def test_text_to_msd_comments(self):
+		text = '\n'.join([
+			'// leading comment line',
+			'#TAG:VALUE // trailing comment',
+			'MORE;',
+			'#OTHER:VALUE;// comment right after the end',
+			'',
+		])
+		msd_items = list(msd.text_to_msd(text))
+		self.assertEqual(msd_items[0], MSDItem('TAG', 'VALUE \nMORE'))
+		self.assertEqual(msd_items[1], MSDItem('OTHER', 'VALUE'))
+		self.assertEqual(len(msd_items), 2)
+
 	def test_text_to_msd_cycle(self):
 		msd_items_a = list(msd.text_to_msd(self.some_text))
 		text_a = msd.msd_to_text(msd_items_a)
@@ -121,18 +140,12 @@ class TestMSD(unittest.TestCase):
 			list(msd.attrs_obj_to_msd(self.simple)),
 		)
 
-		class _EveryOther:
-
-			def __init__(self):
-				self.x = 0
-
-			def filterer(self, *args) -> bool:
-				self.x += 1
-				return self.x % 2 == 1
-
-		f = _EveryOther()
+		counter = count()
 		self.assertEqual(
-			list(msd.attrs_obj_to_msd(self.simple, filterer = f.filterer)),
+			list(msd.attrs_obj_to_msd(
+				self.simple,
+				filterer = lambda *args: next(counter) % 2 == 0, # type: ignore # mypy-generic-fn
+			)),
 			list(msd.attrs_obj_to_msd(self.simple))[::2],
 		)
 
@@ -168,6 +168,11 @@ class TestNoteDataSimple(unittest.TestCase):
 			curr = curr.clear_range(a, b)
 			self.assertEqual(curr, new_notedata)
 
+	def test_clear_range_reversed(self):
+		# an empty range removes nothing, the same way slicing with it selects nothing
+		self.assertEqual(self.simple.clear_range(17, 5), self.simple)
+		self.assertEqual(len(self.simple[17:5]), 0)
+
 	def test_overlay(self):
 		new_notedata = self.simple.overlay(self.long_jack.shift(self.simple_beyond))
 		self.assertEqual(new_notedata[self.simple_beyond:].shift(-self.simple_beyond), self.long_jack)
@@ -211,6 +216,19 @@ class TestNoteDataSimple(unittest.TestCase):
 			self.assertEqual(self.simple.overlay(empty, m), self.simple)
 			self.assertEqual(empty.overlay(self.simple, m), self.simple)
 
+	def test_overlay_disjoint(self):
+		later = self.long_jack.shift(self.simple_beyond)
+		self.assertEqual(self.simple.overlay(later), later.overlay(self.simple))
+		self.assertEqual(len(self.simple.overlay(later)), len(self.simple) + len(later))
+
+		wider: notedata.NoteData = notedata.NoteData([notedata._NoteRow(Fraction(self.simple_beyond), '00100')])
+		self.assertRaises(ValueError, lambda: self.simple.overlay(wider))
+		self.assertRaises(ValueError, lambda: wider.overlay(self.simple))
+		for m in (OverlayMode.KEEP_SELF, OverlayMode.KEEP_OTHER):
+			with self.subTest(mode=m):
+				self.assertRaises(ValueError, lambda: self.simple.overlay(wider, m))
+				self.assertRaises(ValueError, lambda: wider.overlay(self.simple, m))
+
 	def test_column_swap(self):
 		single: notedata.NoteData[str] = notedata.NoteData([notedata._NoteRow(Fraction(3), 'abcdef')])
 		swaps = {
@@ -218,6 +236,8 @@ class TestNoteDataSimple(unittest.TestCase):
 			(5, 4, 3, 2, 1, 0): 'fedcba',
 			(2, 5, 3, 1, 4, 0): 'cfdbea',
 			(1, 2, 1, 2, 1, 2): 'bcbcbc',
+			(4,): 'e',
+			(): '',
 		}
 
 		for u, ex in swaps.items():
@@ -229,6 +249,8 @@ class TestNoteDataSimple(unittest.TestCase):
 			self.assertEqual(notedata.NoteData().column_swap(u), notedata.NoteData())
 
 		self.assertEqual(self.simple.column_swap([3, 2, 1, 0]).column_swap([3, 2, 1, 0]), self.simple)
+		# one-shot iterables are used for every row, not just the first
+		self.assertEqual(self.simple.column_swap(iter([0, 1, 2, 3])), self.simple)
 
 	def test_sm_to_notedata(self):
 		self.assertEqual(notedata.sm_to_notedata(self.simple_text), self.simple)
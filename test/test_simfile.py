@@ -1,33 +1,45 @@
 import unittest
 from pathlib import Path
+from typing import ClassVar
 
 from ssc_pkg import simfile
 
 
 class TestSimfile(unittest.TestCase):
 
-	def _get_file(self, o) -> Path:
+	# parsed once for the whole class, through file objects; the tests below only read them
+	easy_ssc: ClassVar[simfile.Simfile]
+	easy_sm: ClassVar[simfile.Simfile]
+	kitchen_sink: ClassVar[simfile.Simfile]
+
+	@classmethod
+	def _get_file(cls, o) -> Path:
 		return (Path(__file__).parent) / Path(o)
 
+	@classmethod
+	def _load(cls, o) -> simfile.Simfile:
+		with open(cls._get_file(o), encoding='utf-8') as f:
+			return simfile.text_to_simfile(f)
+
+	@classmethod
+	def setUpClass(cls):
+		cls.easy_ssc = cls._load('easy.ssc')
+		cls.easy_sm = cls._load('easy.sm')
+		cls.kitchen_sink = cls._load('kitchen_sink.ssc')
+
 	def test_easy(self):
-		with open(self._get_file('easy.ssc')) as f:
-			loaded = simfile.text_to_simfile(f)
-		self.assertTrue(loaded) # TODO
+		self.assertTrue(self.easy_ssc) # TODO
 
 	def test_kitchen_sink(self):
-		with open(self._get_file('kitchen_sink.ssc'), encoding='utf-8') as f:
-			loaded = simfile.text_to_simfile(f)
-		self.assertTrue(loaded) # TODO
+		self.assertTrue(self.kitchen_sink) # TODO
 
 	def test_sm_ssc_loading(self):
 		'''loading equivalent sm and ssc files generate equivalent objects'''
-		with open(self._get_file('easy.sm')) as sm, open(self._get_file('easy.ssc')) as ssc:
-			self.assertEqual(simfile.text_to_simfile(sm), simfile.text_to_simfile(ssc))
+		self.assertEqual(self.easy_sm, self.easy_ssc)
 
 	def test_sm_ssc_conversions(self):
 		'''saving an sm-compatible file in sm and ssc format saves equivalent data'''
-		with open(self._get_file('easy.ssc')) as f:
-			original = simfile.text_to_simfile(f)
+		original = self.easy_ssc
 		ssc_text = simfile.simfile_to_ssc(original)
 		sm_text = simfile.simfile_to_sm(original)
 		self.assertEqual(original, simfile.text_to_simfile(ssc_text))
@@ -35,8 +47,7 @@ class TestSimfile(unittest.TestCase):
 
 	def test_ssc_roundtrip(self):
 		'''repeated conversions are lossless'''
-		with open(self._get_file('kitchen_sink.ssc'), encoding='utf-8') as f:
-			original_loaded = simfile.text_to_simfile(f)
+		original_loaded = self.kitchen_sink
 		original_saved = simfile.simfile_to_ssc(original_loaded)
 		again_loaded = simfile.text_to_simfile(original_saved)
 		again_saved = simfile.simfile_to_ssc(again_loaded)